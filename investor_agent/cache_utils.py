@@ -0,0 +1,105 @@
+import asyncio
+import inspect
+import logging
+import threading
+import time
+from functools import wraps
+
+logger = logging.getLogger(__name__)
+
+
+def _make_key(args: tuple, kwargs: dict) -> tuple:
+    """Build a hashable cache key, treating lists as tuples."""
+    def freeze(value):
+        return tuple(value) if isinstance(value, list) else value
+    return tuple(freeze(a) for a in args) + tuple((k, freeze(v)) for k, v in sorted(kwargs.items()))
+
+
+def is_empty(value) -> bool:
+    """True for None and for empty DataFrames, dicts, lists and strings, or tuples made only of those.
+
+    yfinance reports most failed fetches this way rather than by raising.
+    """
+    if value is None:
+        return True
+    if isinstance(value, tuple):
+        return all(is_empty(v) for v in value)
+    empty = getattr(value, "empty", None)  # DataFrame/Series; their truth value is ambiguous
+    if isinstance(empty, bool):
+        return empty
+    try:
+        return len(value) == 0
+    except TypeError:
+        return False
+
+
+def ttl_cache(ttl: float, maxsize: int = 128):
+    """Decorator caching a function's results for `ttl` seconds, keyed on its arguments.
+
+    Works for both sync and async functions; concurrent misses on an async function
+    share a single in-flight call. None and empty results (see `is_empty`) are not
+    cached, so a fetch that failed that way is retried on the next call. The oldest entry is evicted once `maxsize` is reached.
+    A `ttl` of 0 or less disables caching and returns the function unchanged.
+    """
+    def decorator(func):
+        if ttl <= 0:
+            return func
+
+        cache: dict[tuple, tuple[float, object]] = {}
+        lock = threading.Lock()
+
+        # Lookups run on every call, so debug messages are formatted lazily
+        def lookup(key: tuple) -> tuple[bool, object]:
+            entry = cache.get(key)
+            if entry and time.monotonic() - entry[0] < ttl:
+                logger.debug("Cache hit for %s%s", func.__name__, key)
+                return True, entry[1]
+            logger.debug("Cache miss for %s%s", func.__name__, key)
+            return False, None
+
+        def store(key: tuple, value) -> None:
+            if is_empty(value):
+                return
+            with lock:
+                cache.pop(key, None)
+                if len(cache) >= maxsize:
+                    cache.pop(next(iter(cache)))
+                cache[key] = (time.monotonic(), value)
+
+        if inspect.iscoroutinefunction(func):
+            # Misses already being fetched, so concurrent callers share one request
+            inflight: dict[tuple, asyncio.Task] = {}
+
+            async def fetch(key: tuple, args: tuple, kwargs: dict):
+                value = await func(*args, **kwargs)
+                store(key, value)
+                return value
+
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                key = _make_key(args, kwargs)
+                hit, value = lookup(key)
+                if hit:
+                    return value
+                task = inflight.get(key)
+                if task is None:
+                    task = inflight[key] = asyncio.ensure_future(fetch(key, args, kwargs))
+                    task.add_done_callback(lambda _: inflight.pop(key, None))
+                else:
+                    logger.debug("Joining in-flight %s%s", func.__name__, key)
+                # Shield so one cancelled caller doesn't cancel the fetch for the others
+                return await asyncio.shield(task)
+        else:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                key = _make_key(args, kwargs)
+                hit, value = lookup(key)
+                if hit:
+                    return value
+                value = func(*args, **kwargs)
+                store(key, value)
+                return value
+
+        wrapper.cache_clear = cache.clear
+        return wrapper
+    return decorator
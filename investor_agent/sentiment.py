@@ -1,12 +1,21 @@
 import logging
-import httpx
-import hishel
+import threading
+import time
+
+from .cache_utils import ttl_cache
+from .yahoo_finance_utils import get_http_client
 
 logger = logging.getLogger(__name__)
 
+# CNN refreshes the index a few times per day
+FNG_CACHE_TTL = 900  # seconds
+GOOGLE_TRENDS_CACHE_TTL = 3600  # seconds
+
 
+@ttl_cache(ttl=FNG_CACHE_TTL, maxsize=1)
 async def fetch_fng_data() -> dict | None:
-    """Fetch the raw Fear & Greed data from CNN."""
+    """Fetch the raw Fear & Greed data from CNN. Results are cached for FNG_CACHE_TTL seconds,
+    so callers must not mutate the returned dict."""
 
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
@@ -14,13 +23,55 @@ async def fetch_fng_data() -> dict | None:
         "Referer": "https://www.cnn.com/markets/fear-and-greed",
     }
 
-    # Use hishel caching to avoid refetching identical data too frequently
-    hishel.install_cache()
-    
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            "https://production.dataviz.cnn.io/index/fearandgreed/graphdata",
-            headers=headers
-        )
-        response.raise_for_status()
-        return response.json()
\ No newline at end of file
+    response = await get_http_client().get(
+        "https://production.dataviz.cnn.io/index/fearandgreed/graphdata",
+        headers=headers
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+_pytrends = None
+# TrendReq keeps per-query state, so queries on the shared instance are serialized
+_pytrends_lock = threading.Lock()
+
+
+@ttl_cache(ttl=GOOGLE_TRENDS_CACHE_TTL)
+def fetch_google_trends(
+    keywords: tuple[str, ...],
+    period_days: int = 7,
+    max_retries: int = 3,
+    base_delay: float = 2.0
+) -> dict:
+    """Fetch mean Google Trends interest per keyword. Results are cached for GOOGLE_TRENDS_CACHE_TTL seconds.
+
+    One TrendReq is reused across calls so its Google cookie is fetched once; on a 429 it is
+    dropped (forcing a fresh cookie) and the query retried with exponential backoff.
+    """
+    global _pytrends
+    from pytrends.exceptions import TooManyRequestsError
+    from pytrends.request import TrendReq
+
+    logger.info(f"Fetching Google Trends data for {period_days} days")
+
+    keywords = list(keywords)
+    with _pytrends_lock:
+        for attempt in range(max_retries):
+            try:
+                if _pytrends is None:
+                    _pytrends = TrendReq(hl='en-US', tz=360)
+                _pytrends.build_payload(keywords, timeframe=f'now {period_days}-d')
+                data = _pytrends.interest_over_time()
+                break
+            except TooManyRequestsError:
+                _pytrends = None
+                if attempt == max_retries - 1:
+                    raise
+                wait_time = base_delay * (2 ** attempt)
+                logger.warning(f"Google Trends rate limited on attempt {attempt + 1}, waiting {wait_time}s before retry")
+                time.sleep(wait_time)
+
+    if data.empty:
+        raise ValueError("No data returned from Google Trends")
+
+    return data[keywords].mean().to_dict()
@@ -1,23 +1,20 @@
+import asyncio
+from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from importlib.util import find_spec
 import logging
 from typing import Literal
 import sys
 
-import pandas as pd
+import anyio
 from mcp.server.fastmcp import FastMCP
-try:
-    import talib  # type: ignore
-    _ta_available = True
-except ImportError:
-    _ta_available = False
-
-try:
-    import playwright  # type: ignore
-    _playwright_available = True
-except ImportError:
-    _playwright_available = False
+# Optional dependencies are only located here; they're imported on first use
+_ta_available = find_spec("talib") is not None
+_playwright_available = find_spec("playwright") is not None
 
 from . import yfinance_utils
-from .sentiment import fetch_fng_data
+from .sentiment import fetch_fng_data, fetch_google_trends
 from . import yahoo_finance_utils
 
 logger = logging.getLogger(__name__)
@@ -28,7 +25,78 @@ logging.basicConfig(
     handlers=[logging.StreamHandler(sys.stderr)]
 )
 
-mcp = FastMCP("Investor-Agent", dependencies=["yfinance", "httpx", "pandas", "pytrends", "beautifulsoup4"])
+_active_sessions = 0
+
+@asynccontextmanager
+async def lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """Close the shared HTTP client once the last session shuts down.
+
+    Lifespan runs per session on HTTP transports, hence the counter.
+    """
+    global _active_sessions
+    _active_sessions += 1
+    try:
+        yield
+    finally:
+        _active_sessions -= 1
+        if not _active_sessions:
+            await yahoo_finance_utils.close_http_client()
+
+mcp = FastMCP("Investor-Agent", dependencies=["yfinance", "httpx", "pandas", "pytrends", "beautifulsoup4"], lifespan=lifespan)
+
+# Shared pool for blocking yfinance calls, so tools never block the event loop
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="yfinance")
+TASK_TIMEOUT = 30.0  # seconds
+TOOL_TIMEOUT = 120.0  # seconds; leaves room for the rate-limit backoff (5s, 15s) inside one call
+MAX_BATCH_TICKERS = 100
+BATCH_CHUNK_SIZE = 8  # half the pool, so batch tools leave workers for other calls
+
+
+async def _run_blocking(fn, *args, timeout: float = TOOL_TIMEOUT):
+    """Run a blocking call on the shared pool, giving up after `timeout` seconds.
+
+    The worker thread can't be interrupted, but the tool returns an error instead of
+    holding the request open for as long as the slowest upstream takes.
+    """
+    future = asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+    try:
+        return await asyncio.wait_for(future, timeout)
+    except TimeoutError:
+        raise TimeoutError(f"{fn.__name__} did not finish within {timeout}s") from None
+
+
+async def _fetch_concurrently(calls: dict[str, tuple], timeout: float = TASK_TIMEOUT) -> dict:
+    """Run `{key: (fn, *args)}` concurrently on the shared pool and return `{key: result}`.
+
+    Failed or timed-out calls map to None so one slow endpoint can't stall the whole response.
+    """
+    async def run(key: str, call: tuple):
+        try:
+            return await _run_blocking(*call, timeout=timeout)
+        except Exception as e:
+            logger.warning(f"Fetching {key} failed: {e!r}")
+            return None
+
+    results = await asyncio.gather(*(run(key, call) for key, call in calls.items()))
+    return dict(zip(calls, results))
+
+
+# Core financial metrics kept from yfinance's ticker info
+ESSENTIAL_INFO_FIELDS = frozenset({
+    'symbol', 'longName', 'currentPrice', 'marketCap', 'volume', 'trailingPE',
+    'forwardPE', 'dividendYield', 'beta', 'eps', 'totalRevenue', 'totalDebt',
+    'profitMargins', 'operatingMargins', 'returnOnEquity', 'returnOnAssets',
+    'revenueGrowth', 'earningsGrowth', 'bookValue', 'priceToBook',
+    'enterpriseValue', 'pegRatio', 'trailingEps', 'forwardEps'
+})
+
+
+def _essential_info(info: dict) -> dict:
+    return {k: v for k, v in info.items() if k in ESSENTIAL_INFO_FIELDS}
+
+
+# Price history periods long enough to be sampled monthly rather than daily
+MONTHLY_INTERVAL_PERIODS = frozenset({"2y", "5y", "10y", "max"})
 
 
 FearGreedIndicator = Literal[
@@ -72,6 +140,9 @@ async def get_cnn_fear_greed_index(
     if not data:
         raise RuntimeError("Unable to fetch CNN Fear & Greed Index data")
 
+    # fetch_fng_data returns a cached payload; work on a copy
+    data = dict(data)
+
     if indicators:
         invalid_keys = set(indicators) - set(data.keys())
         if invalid_keys:
@@ -96,32 +167,24 @@ async def get_cnn_fear_greed_index(
 @mcp.tool()
 async def get_crypto_fear_greed_index(days: int = 7) -> dict:
     """Get historical Crypto Fear & Greed Index data."""
-    async with yahoo_finance_utils.create_cached_async_client() as client:
-        response = await client.get("https://api.alternative.me/fng/", params={"limit": days})
-        response.raise_for_status()
-        return response.json()["data"]
+    client = yahoo_finance_utils.get_http_client()
+    response = await client.get("https://api.alternative.me/fng/", params={"limit": days})
+    response.raise_for_status()
+    return response.json()["data"]
 
 @mcp.tool()
-def get_google_trends(
+async def get_google_trends(
     keywords: list[str],
     period_days: int = 7
 ) -> dict:
     """Get Google Trends relative search interest for specified keywords."""
-    from pytrends.request import TrendReq
-
-    logger.info(f"Fetching Google Trends data for {period_days} days")
-
-    pytrends = TrendReq(hl='en-US', tz=360)
-    pytrends.build_payload(keywords, timeframe=f'now {period_days}-d')
-
-    data = pytrends.interest_over_time()
-    if data.empty:
-        raise ValueError("No data returned from Google Trends")
-
-    return data[keywords].mean().to_dict()
+    if not keywords:
+        raise ValueError("At least one keyword is required")
+    # Sort so the same keyword set shares a cache entry regardless of order
+    return dict(await _run_blocking(fetch_google_trends, tuple(sorted(keywords)), period_days))
 
 @mcp.tool()
-def get_ticker_data(
+async def get_ticker_data(
     ticker: str,
     max_news: int = 5,
     max_recommendations: int = 5,
@@ -135,40 +198,59 @@ def get_ticker_data(
     - recommendations: Latest analyst recommendations (buy/sell/hold ratings)
     - upgrades_downgrades: Recent analyst rating changes
     """
-    info = yfinance_utils.get_ticker_info(ticker)
+    results = await _fetch_concurrently({
+        "info": (yfinance_utils.get_ticker_info, ticker),
+        "calendar": (yfinance_utils.get_calendar, ticker),
+        "news": (yfinance_utils.get_news, ticker, max_news),
+        "recommendations": (yfinance_utils.get_analyst_data, ticker, "recommendations", max_recommendations),
+        "upgrades_downgrades": (yfinance_utils.get_analyst_data, ticker, "upgrades", max_upgrades),
+    })
+
+    info = results["info"]
     if not info:
         raise ValueError(f"No information available for {ticker}")
 
-    # Keep only essential fields
-    essential_fields = {
-        'symbol', 'longName', 'currentPrice', 'marketCap', 'volume', 'trailingPE',
-        'forwardPE', 'dividendYield', 'beta', 'eps', 'totalRevenue', 'totalDebt',
-        'profitMargins', 'operatingMargins', 'returnOnEquity', 'returnOnAssets',
-        'revenueGrowth', 'earningsGrowth', 'bookValue', 'priceToBook',
-        'enterpriseValue', 'pegRatio', 'trailingEps', 'forwardEps'
-    }
-
-    filtered_info = {k: v for k, v in info.items() if k in essential_fields}
-    data = {"info": filtered_info}
+    data = {"info": _essential_info(info)}
 
-    if calendar := yfinance_utils.get_calendar(ticker):
+    if calendar := results["calendar"]:
         data["calendar"] = calendar
 
-    if news := yfinance_utils.get_news(ticker, limit=max_news):
+    if news := results["news"]:
         data["news"] = news
 
-    if recommendations := yfinance_utils.get_analyst_data(ticker, "recommendations", max_recommendations):
-        if not recommendations.empty:
-            data["recommendations"] = recommendations.to_dict('split')
-
-    if upgrades := yfinance_utils.get_analyst_data(ticker, "upgrades", max_upgrades):
-        if not upgrades.empty:
-            data["upgrades_downgrades"] = upgrades.to_dict('split')
+    for key in ("recommendations", "upgrades_downgrades"):
+        df = results[key]
+        if df is not None and not df.empty:
+            data[key] = df.to_dict('split')
 
     return data
 
 @mcp.tool()
-def get_options(
+async def get_ticker_info_batch(tickers: list[str]) -> dict:
+    """Get core financial metrics (the `info` section of get_ticker_data) for up to 100 tickers at once, keyed by ticker.
+    Tickers that could not be fetched are left out."""
+    if not tickers:
+        raise ValueError("At least one ticker is required")
+    symbols = list(dict.fromkeys(ticker.upper() for ticker in tickers))
+    if len(symbols) > MAX_BATCH_TICKERS:
+        raise ValueError(f"At most {MAX_BATCH_TICKERS} tickers per call, got {len(symbols)}")
+
+    # Fetch in chunks smaller than the pool so queued calls don't eat into their own timeout
+    # and a large batch can't take every worker from other tools
+    results = {}
+    for i in range(0, len(symbols), BATCH_CHUNK_SIZE):
+        chunk = symbols[i:i + BATCH_CHUNK_SIZE]
+        results |= await _fetch_concurrently({symbol: (yfinance_utils.get_ticker_info, symbol) for symbol in chunk})
+
+    infos = {symbol: _essential_info(info) for symbol, info in results.items() if info}
+    if not infos:
+        raise ValueError(f"No information available for {symbols}")
+    if failed := [symbol for symbol in symbols if symbol not in infos]:
+        logger.warning(f"No information available for {len(failed)} of {len(symbols)} tickers: {failed}")
+    return infos
+
+@mcp.tool()
+async def get_options(
     ticker_symbol: str,
     num_options: int = 10,
     start_date: str | None = None,
@@ -178,8 +260,9 @@ def get_options(
     option_type: Literal["C", "P"] | None = None,
 ) -> dict:
     """Get options data. Dates: YYYY-MM-DD. Type: C=calls, P=puts."""
-    df, error = yfinance_utils.get_filtered_options(
-        ticker_symbol, start_date, end_date, strike_lower, strike_upper, option_type
+    df, error = await _run_blocking(
+        yfinance_utils.get_filtered_options,
+        ticker_symbol, start_date, end_date, strike_lower, strike_upper, option_type, num_options
     )
     if error:
         raise ValueError(error)
@@ -188,26 +271,45 @@ def get_options(
 
 
 @mcp.tool()
-def get_price_history(
+async def get_price_history(
     ticker: str,
     period: Literal["1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "ytd", "max"] = "1mo"
 ) -> dict:
     """Get historical OHLCV data: daily intervals for ≤1y periods, monthly intervals for ≥2y periods."""
-    interval = "1mo" if period in ["2y", "5y", "10y", "max"] else "1d"
+    interval = "1mo" if period in MONTHLY_INTERVAL_PERIODS else "1d"
 
-    history = yfinance_utils.get_price_history(ticker, period, interval)
+    history = await _run_blocking(yfinance_utils.get_price_history, ticker, period, interval)
     if history is None or history.empty:
         raise ValueError(f"No historical data found for {ticker}")
     return history.to_dict('split')
 
 @mcp.tool()
-def get_financial_statements(
+async def get_price_history_batch(
+    tickers: list[str],
+    period: Literal["1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "ytd", "max"] = "1mo"
+) -> dict:
+    """Get historical OHLCV data for up to 100 tickers in one request, keyed by ticker. Same intervals as get_price_history."""
+    if not tickers:
+        raise ValueError("At least one ticker is required")
+    # Downloads run one at a time, so keep a single request from holding the download lock too long
+    symbols = list(dict.fromkeys(ticker.upper() for ticker in tickers))
+    if len(symbols) > MAX_BATCH_TICKERS:
+        raise ValueError(f"At most {MAX_BATCH_TICKERS} tickers per call, got {len(symbols)}")
+    interval = "1mo" if period in MONTHLY_INTERVAL_PERIODS else "1d"
+
+    histories = await _run_blocking(yfinance_utils.get_price_history_batch, symbols, period, interval)
+    if not histories:
+        raise ValueError(f"No historical data found for {symbols}")
+    return {ticker: history.to_dict('split') for ticker, history in histories.items()}
+
+@mcp.tool()
+async def get_financial_statements(
     ticker: str,
     statement_type: Literal["income", "balance", "cash"] = "income",
     frequency: Literal["quarterly", "annual"] = "quarterly",
     max_periods: int = 8
 ) -> dict:
-    data = yfinance_utils.get_financial_statements(ticker, statement_type, frequency)
+    data = await _run_blocking(yfinance_utils.get_financial_statements, ticker, statement_type, frequency)
     if data is None or data.empty:
         raise ValueError(f"No {statement_type} statement data found for {ticker}")
 
@@ -216,14 +318,32 @@ def get_financial_statements(
     return data.to_dict('split')
 
 @mcp.tool()
-def get_institutional_holders(ticker: str, top_n: int = 20) -> dict:
-    """Get major institutional and mutual fund holders."""
-    inst_holders, fund_holders = yfinance_utils.get_institutional_holders(ticker, top_n)
+async def get_all_financial_statements(
+    ticker: str,
+    frequency: Literal["quarterly", "annual"] = "quarterly",
+    max_periods: int = 8
+) -> dict:
+    """Get income, balance sheet and cash flow statements in one call, fetched concurrently."""
+    results = await _fetch_concurrently({
+        statement_type: (yfinance_utils.get_financial_statements, ticker, statement_type, frequency)
+        for statement_type in ("income", "balance", "cash")
+    })
+
+    statements = {
+        statement_type: data.iloc[:, :max_periods].to_dict('split')
+        for statement_type, data in results.items()
+        if data is not None and not data.empty
+    }
+    if not statements:
+        raise ValueError(f"No financial statement data found for {ticker}")
+    return statements
 
-    if (inst_holders is None or inst_holders.empty) and (fund_holders is None or fund_holders.empty):
-        raise ValueError(f"No institutional holder data found for {ticker}")
+@mcp.tool()
+async def get_institutional_holders(ticker: str, top_n: int = 20) -> dict:
+    """Get major institutional and mutual fund holders."""
+    inst_holders, fund_holders = await _run_blocking(yfinance_utils.get_institutional_holders, ticker, top_n)
 
-    return {
+    holders = {
         key: data.to_dict('split')
         for key, data in [
             ("institutional_holders", inst_holders),
@@ -231,17 +351,20 @@ def get_institutional_holders(ticker: str, top_n: int = 20) -> dict:
         ]
         if data is not None and not data.empty
     }
+    if not holders:
+        raise ValueError(f"No institutional holder data found for {ticker}")
+    return holders
 
 @mcp.tool()
-def get_earnings_history(ticker: str, max_entries: int = 8) -> dict:
-    earnings_history = yfinance_utils.get_earnings_history(ticker, limit=max_entries)
+async def get_earnings_history(ticker: str, max_entries: int = 8) -> dict:
+    earnings_history = await _run_blocking(yfinance_utils.get_earnings_history, ticker, max_entries)
     if earnings_history is None or earnings_history.empty:
         raise ValueError(f"No earnings history data found for {ticker}")
     return earnings_history.to_dict('split')
 
 @mcp.tool()
-def get_insider_trades(ticker: str, max_trades: int = 20) -> dict:
-    trades = yfinance_utils.get_insider_trades(ticker, limit=max_trades)
+async def get_insider_trades(ticker: str, max_trades: int = 20) -> dict:
+    trades = await _run_blocking(yfinance_utils.get_insider_trades, ticker, max_trades)
     if trades is None or trades.empty:
         raise ValueError(f"No insider trading data found for {ticker}")
     return trades.to_dict('split')
@@ -254,13 +377,13 @@ if _playwright_available:
         end: str | None = None,
         limit: int = 100
     ) -> dict:
-        """Get earnings calendar for a date range."""
+        """Get earnings calendar for a date range. `limit` is capped at 1000."""
         return await yahoo_finance_utils.get_earnings_calendar_data(start, end, limit)
 
 # Only register the technical indicator tool if TA-Lib is available
 if _ta_available:
     @mcp.tool()
-    def calculate_technical_indicator(
+    async def calculate_technical_indicator(
         ticker: str,
         indicator: Literal["SMA", "EMA", "RSI", "MACD", "BBANDS"],
         period: Literal["1mo", "3mo", "6mo", "1y", "2y", "5y"] = "1y",
@@ -271,11 +394,16 @@ if _ta_available:
         nbdev: int = 2,        # Default standard deviation for BBANDS
         matype: int = 0,       # Default MA type for BBANDS (0=SMA)
         num_results: int = 50  # Number of recent results to return
-    ) -> dict:
+    ) -> list[dict]:
         """Calculate technical indicators with proper date alignment and result limiting."""
         import numpy as np
+        # find_spec only sees the Python wrapper; the import fails if the TA-Lib C library is missing
+        try:
+            import talib  # type: ignore
+        except ImportError as e:
+            raise ValueError(f"TA-Lib not installed: {e}. Install the TA-Lib C library, then uvx investor-agent[ta]") from e
 
-        history = yfinance_utils.get_price_history(ticker, period=period, interval="1d")
+        history = await _run_blocking(yfinance_utils.get_price_history, ticker, period, "1d")
         if history is None or history.empty or 'Close' not in history.columns:
             raise ValueError(f"No valid historical data found for {ticker}")
 
@@ -300,18 +428,34 @@ if _ta_available:
         }
         result = indicator_funcs[indicator]()
 
-        # Limit results and prepare data
-        dates = history.index.strftime('%Y-%m-%d').tolist()
-        start_idx = max(0, len(dates) - num_results) if num_results > 0 else 0
+        # Limit results, then convert the whole window in one pass per frame
+        start_idx = max(0, len(history) - num_results) if num_results > 0 else 0
+        recent = history.iloc[start_idx:]
+        # One isnan mask per indicator array; NaN (warm-up period) becomes None
+        columns = [
+            np.where(np.isnan(window := values[start_idx:]), None, window).tolist()
+            for values in result.values()
+        ]
+        indicator_rows = [dict(zip(result, row)) for row in zip(*columns)]
 
         return [
-            {
-                "date": dates[i],
-                "price": history.iloc[i].to_dict(),
-                "indicators": {
-                    key: None if np.isnan(val := values[i]) else float(val)
-                    for key, values in result.items()
-                }
-            }
-            for i in range(start_idx, len(dates))
-        ]
\ No newline at end of file
+            {"date": date, "price": price, "indicators": indicators}
+            for date, price, indicators in zip(
+                recent.index.strftime('%Y-%m-%d'), recent.to_dict('records'), indicator_rows
+            )
+        ]
+
+
+def main() -> None:
+    """Console-script entry point: serve over stdio, on uvloop when it's installed (not available on Windows)."""
+    backend_options = {}
+    try:
+        import uvloop  # type: ignore
+        backend_options["loop_factory"] = uvloop.new_event_loop
+    except ImportError:
+        pass
+    anyio.run(mcp.run_stdio_async, backend_options=backend_options)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
+import asyncio
 import logging
 import datetime
+import io
 import json
 import re
 from typing import Literal
@@ -8,6 +10,8 @@ import httpx
 import pandas as pd
 import hishel
 
+from .cache_utils import ttl_cache
+
 logger = logging.getLogger(__name__)
 
 YAHOO_HEADERS = {
@@ -19,14 +23,38 @@ YAHOO_HEADERS = {
     'Upgrade-Insecure-Requests': '1',
 }
 
-def create_cached_async_client(headers: dict | None = None) -> httpx.AsyncClient:
-    """Create an httpx.AsyncClient with caching enabled via hishel."""
-    hishel.install_cache()
-    return httpx.AsyncClient(
-        timeout=30.0,
-        follow_redirects=True,
-        headers=headers,
-    )
+HTTP_CACHE_TTL = 900  # seconds before stored responses are evicted from the hishel cache
+MOVERS_CACHE_TTL = 60  # seconds; movers lists change throughout the session
+EARNINGS_CALENDAR_PAGE_SIZE = 100
+EARNINGS_CALENDAR_MAX_PAGES = 10  # so `limit` is clamped to 1,000 rows
+
+_http_client: httpx.AsyncClient | None = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client: a hishel cache client with pooled keep-alive connections.
+
+    Reusing one client keeps TCP/TLS sessions alive across tool calls. Pass per-site
+    headers on each request rather than on the client.
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        # Scoped to this client, unlike hishel.install_cache() which patches httpx globally
+        _http_client = hishel.AsyncCacheClient(
+            storage=hishel.AsyncFileStorage(ttl=HTTP_CACHE_TTL),
+            timeout=30.0,
+            follow_redirects=True,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=40),
+        )
+    return _http_client
+
+async def close_http_client() -> None:
+    """Close the shared client, if one was opened."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+SUFFIX_MULTIPLIERS = {'K': 1_000, 'M': 1_000_000, 'B': 1_000_000_000, 'T': 1_000_000_000_000}
 
 def convert_to_numeric(value_str):
     """Convert string values like '1.2M', '3.45B', '123.4K' to numeric values."""
@@ -41,9 +69,7 @@ def convert_to_numeric(value_str):
         pass
 
     # Handle suffixed values (K, M, B, T)
-    multipliers = {'K': 1_000, 'M': 1_000_000, 'B': 1_000_000_000, 'T': 1_000_000_000_000}
-
-    for suffix, multiplier in multipliers.items():
+    for suffix, multiplier in SUFFIX_MULTIPLIERS.items():
         if value_str.upper().endswith(suffix):
             try:
                 return float(value_str[:-1]) * multiplier
@@ -52,31 +78,45 @@ def convert_to_numeric(value_str):
 
     return value_str
 
+def convert_series_to_numeric(series: pd.Series) -> pd.Series:
+    """Vectorized convert_to_numeric over a column; text that isn't a number is kept as-is."""
+    text = series.astype(str).str.strip().str.replace(',', '', regex=False)
+    parts = text.str.extract(r'^([-+]?(?:\d+\.?\d*|\.\d+))([KMBT]?)$', flags=re.IGNORECASE)
+    multipliers = parts[1].str.upper().map(SUFFIX_MULTIPLIERS).fillna(1)
+    numbers = pd.to_numeric(parts[0], errors='coerce').astype(float) * multipliers
+
+    unparsed = numbers.isna() & text.notna() & ~text.isin(['', '-', 'nan', 'None'])
+    if not unparsed.any():
+        return numbers
+    result = numbers.astype(object)
+    result[numbers.isna()] = None
+    result[unparsed] = text[unparsed]
+    return result
+
 async def _parse_earnings_json(url: str) -> dict:
     """Parse earnings JSON from Yahoo Finance URL using existing async infrastructure."""
-    async with create_cached_async_client(headers=YAHOO_HEADERS) as client:
-        response = await client.get(url)
-        response.raise_for_status()
-
-        content = response.text
-
-        # Try the original patterns that worked in the past
-        patterns = [
-            r'root\.App\.main\s*=\s*({.*?});',
-            r'window\.App\.main\s*=\s*({.*?});'
-        ]
-
-        for pattern_name, pattern in zip(['root.App.main', 'window.App.main'], patterns):
-            match = re.search(pattern, content, re.DOTALL)
-            if match:
-                try:
-                    data = json.loads(match.group(1))
-                    logger.info(f"Successfully parsed earnings data with {pattern_name} pattern")
-                    return data
-                except json.JSONDecodeError as e:
-                    logger.warning(f"Failed to parse {pattern_name} JSON: {e}")
-
-        raise ValueError("Could not find earnings data using original patterns")
+    response = await get_http_client().get(url, headers=YAHOO_HEADERS)
+    response.raise_for_status()
+
+    content = response.text
+
+    # Try the original patterns that worked in the past
+    patterns = [
+        r'root\.App\.main\s*=\s*({.*?});',
+        r'window\.App\.main\s*=\s*({.*?});'
+    ]
+
+    for pattern_name, pattern in zip(['root.App.main', 'window.App.main'], patterns):
+        match = re.search(pattern, content, re.DOTALL)
+        if match:
+            try:
+                data = json.loads(match.group(1))
+                logger.info(f"Successfully parsed earnings data with {pattern_name} pattern")
+                return data
+            except json.JSONDecodeError as e:
+                logger.warning(f"Failed to parse {pattern_name} JSON: {e}")
+
+    raise ValueError("Could not find earnings data using original patterns")
 
 async def get_earnings_for_date(date, offset=0, count=1):
     """Get earnings for a specific date with pagination - async version of original working code."""
@@ -138,7 +178,11 @@ async def get_earnings_calendar_data(
     end_date: str = None,
     limit: int = 100
 ) -> dict:
-    """Get earnings calendar data using Playwright with pagination support."""
+    """Get earnings calendar data using Playwright with pagination support.
+
+    `limit` is clamped to EARNINGS_CALENDAR_MAX_PAGES pages of results; metadata reports
+    the limit applied and whether it was capped.
+    """
     try:
         from playwright.async_api import async_playwright
     except ImportError:
@@ -148,8 +192,13 @@ async def get_earnings_calendar_data(
     start_date = start_date or datetime.date.today().strftime('%Y-%m-%d')
     end_date = end_date or (pd.Timestamp(start_date) + pd.DateOffset(days=7)).strftime('%Y-%m-%d')
 
+    max_rows = EARNINGS_CALENDAR_MAX_PAGES * EARNINGS_CALENDAR_PAGE_SIZE
+    limit_capped = limit > max_rows
+    limit = min(limit, max_rows)
+
     all_earnings = []
     offset = 0
+    pages_fetched = 0
 
     async with async_playwright() as p:
         async with await p.chromium.launch(headless=True) as browser:
@@ -160,10 +209,11 @@ async def get_earnings_calendar_data(
 
             # Keep fetching pages until we have enough data or no more pages
             while len(all_earnings) < limit:
-                url = f"https://finance.yahoo.com/calendar/earnings?from={start_date}&to={end_date}&offset={offset}&size=100"
-                logger.info(f"Loading earnings page {offset//100 + 1} with Playwright")
+                url = f"https://finance.yahoo.com/calendar/earnings?from={start_date}&to={end_date}&offset={offset}&size={EARNINGS_CALENDAR_PAGE_SIZE}"
+                logger.info(f"Loading earnings page {pages_fetched + 1} with Playwright")
 
                 await page.goto(url, wait_until='domcontentloaded', timeout=60000)
+                pages_fetched += 1
                 await page.wait_for_timeout(3000)
 
                 # Extract earnings data from the current page
@@ -186,14 +236,14 @@ async def get_earnings_calendar_data(
                     break
 
                 all_earnings.extend(earnings_data)
-                logger.info(f"Retrieved {len(earnings_data)} earnings from page {offset//100 + 1}")
+                logger.info(f"Retrieved {len(earnings_data)} earnings from page {pages_fetched}")
 
                 # If we got less than the page size, we've reached the end
-                if len(earnings_data) < 100:
-                    logger.info(f"Got {len(earnings_data)} < 100 earnings - reached final page")
+                if len(earnings_data) < EARNINGS_CALENDAR_PAGE_SIZE:
+                    logger.info(f"Got {len(earnings_data)} < {EARNINGS_CALENDAR_PAGE_SIZE} earnings - reached final page")
                     break
 
-                offset += 100
+                offset += EARNINGS_CALENDAR_PAGE_SIZE
                 await page.wait_for_timeout(1000)
 
     # Convert to structured earnings data (limit to requested count)
@@ -218,7 +268,9 @@ async def get_earnings_calendar_data(
             'end_date': end_date,
             'count': len(earnings_list),
             'total_found': len(all_earnings),
-            'pages_fetched': (offset // 100) + 1,
+            'pages_fetched': pages_fetched,
+            'limit': limit,
+            'limit_capped': limit_capped,
             'timestamp': pd.Timestamp.now().isoformat(),
             'source': 'Yahoo Finance Playwright Scraping (Paginated)'
         },
@@ -226,6 +278,7 @@ async def get_earnings_calendar_data(
     }
 
 
+@ttl_cache(ttl=MOVERS_CACHE_TTL)
 async def get_market_movers_data(
     category: Literal["gainers", "losers", "most-active"] = "most-active",
     count: int = 25,
@@ -256,38 +309,41 @@ async def get_market_movers_data(
         if not url:
             raise ValueError(f"Invalid category: {category}")
 
-    async with create_cached_async_client(headers=YAHOO_HEADERS) as client:
-        logger.info(f"Fetching {category} ({market_session} session) from: {url}")
-        response = await client.get(url)
-        response.raise_for_status()
-
-        # Parse with pandas
-        tables = pd.read_html(response.content)
-        if not tables:
-            raise ValueError(f"No data found for {category}")
-
-        df = tables[0].copy()
-
-        # Clean up the data
-        df = df.drop('52 Week Range', axis=1, errors='ignore')
-
-        # Clean percentage change column
-        if '% Change' in df.columns:
-            df['% Change'] = df['% Change'].astype(str).str.replace('[%+,]', '', regex=True)
-            df['% Change'] = pd.to_numeric(df['% Change'], errors='coerce')
-
-        # Clean numeric columns
-        numeric_cols = [col for col in df.columns if any(x in col for x in ['Vol', 'Volume', 'Market Cap', 'Market'])]
-        for col in numeric_cols:
-            df[col] = df[col].astype(str).apply(convert_to_numeric)
-
-        return {
-            'metadata': {
-                'category': category,
-                'market_session': market_session if category == "most-active" else "regular",
-                'count': len(df),
-                'timestamp': pd.Timestamp.now().isoformat(),
-                'source': 'Yahoo Finance'
-            },
-            'stocks': df.head(count).to_dict('records')
-        }
\ No newline at end of file
+    logger.info(f"Fetching {category} ({market_session} session) from: {url}")
+    response = await get_http_client().get(url, headers=YAHOO_HEADERS)
+    response.raise_for_status()
+
+    # Parse with pandas off the event loop; lxml parsing of the full page is CPU-bound
+    tables = await asyncio.to_thread(pd.read_html, io.BytesIO(response.content))
+    if not tables:
+        raise ValueError(f"No data found for {category}")
+
+    # Clean up the data (drop returns a new frame, so no defensive copy is needed)
+    df = tables[0].drop('52 Week Range', axis=1, errors='ignore')
+
+    # Clean numeric columns
+    cleaned = {
+        col: convert_series_to_numeric(df[col])
+        for col in df.columns
+        if any(x in col for x in ['Vol', 'Volume', 'Market Cap', 'Market'])
+    }
+
+    # Clean percentage change column
+    if '% Change' in df.columns:
+        cleaned['% Change'] = pd.to_numeric(
+            df['% Change'].astype(str).str.replace('[%+,]', '', regex=True), errors='coerce'
+        )
+
+    # Write all cleaned columns back in a single assign
+    df = df.assign(**cleaned)
+
+    return {
+        'metadata': {
+            'category': category,
+            'market_session': market_session if category == "most-active" else "regular",
+            'count': len(df),
+            'timestamp': pd.Timestamp.now().isoformat(),
+            'source': 'Yahoo Finance'
+        },
+        'stocks': df.head(count).to_dict('records')
+    }
\ No newline at end of file
@@ -1,16 +1,92 @@
+from collections import deque
+from collections.abc import Iterator
 from concurrent.futures import ThreadPoolExecutor
 import logging
+import os
+import threading
 from typing import Literal
-from datetime import datetime
+from datetime import date, datetime
 import time
 from functools import wraps
+from typing import TYPE_CHECKING
 
-import yfinance as yf
-from yfinance.exceptions import YFRateLimitError
 import pandas as pd
 
+from .cache_utils import is_empty, ttl_cache
+
+if TYPE_CHECKING:
+    import yfinance as yf
+
 logger = logging.getLogger(__name__)
 
+# Lifetime (seconds) of reused yf.Ticker objects; INVESTOR_AGENT_CACHE_TTL=0 disables all caching here
+TICKER_CACHE_TTL = float(os.getenv("INVESTOR_AGENT_CACHE_TTL", "300"))
+_caching_enabled = TICKER_CACHE_TTL > 0
+
+# Per-endpoint cache lifetimes (seconds), by how quickly the underlying data changes
+PRICE_CACHE_TTL = 60 if _caching_enabled else 0
+INFO_CACHE_TTL = 300 if _caching_enabled else 0
+ANALYST_CACHE_TTL = 3600 if _caching_enabled else 0
+FUNDAMENTALS_CACHE_TTL = 24 * 3600 if _caching_enabled else 0
+
+OPTION_CHAIN_WORKERS = 8
+OPTION_CHAIN_TIMEOUT = 10.0  # seconds per expiry
+
+_ticker_cache: dict[str, tuple[float, 'yf.Ticker', threading.Lock]] = {}
+_ticker_cache_lock = threading.Lock()
+_download_lock = threading.Lock()
+
+def _get_ticker_entry(ticker: str) -> tuple['yf.Ticker', threading.Lock]:
+    """Return a shared yf.Ticker for the symbol, reused for TICKER_CACHE_TTL seconds, and its lock.
+
+    yf.Ticker memoizes what it fetches (quote modules, option expirations, news), so
+    reusing it lets separate tool calls on the same symbol skip repeat requests. The lock
+    lives and expires with the Ticker, for lookups that aren't safe to overlap.
+    """
+    # Imported on first use; yfinance is slow to import and not every session touches it
+    import yfinance as yf
+
+    symbol = ticker.upper()
+    if not _caching_enabled:
+        return yf.Ticker(symbol), threading.Lock()
+
+    now = time.monotonic()
+    with _ticker_cache_lock:
+        entry = _ticker_cache.get(symbol)
+        if entry and now - entry[0] < TICKER_CACHE_TTL:
+            return entry[1], entry[2]
+        # Drop expired entries so the cache doesn't grow with every symbol ever seen
+        for key in [key for key, (created, *_) in _ticker_cache.items() if now - created >= TICKER_CACHE_TTL]:
+            del _ticker_cache[key]
+        entry = _ticker_cache[symbol] = (now, yf.Ticker(symbol), threading.Lock())
+        return entry[1], entry[2]
+
+def _get_ticker(ticker: str) -> 'yf.Ticker':
+    return _get_ticker_entry(ticker)[0]
+
+def _drop_ticker(symbol: str) -> None:
+    """Forget the shared yf.Ticker for the symbol so the next call builds a fresh one."""
+    with _ticker_cache_lock:
+        _ticker_cache.pop(symbol, None)
+
+def _drop_ticker_on_failure(func):
+    """Decorator discarding the symbol's shared Ticker when `func` raises or returns an empty result.
+
+    yfinance memoizes failed fetches on the Ticker (as None for info, empty frames or dicts
+    elsewhere), so without this one transient error would stick for TICKER_CACHE_TTL.
+    """
+    @wraps(func)
+    def wrapper(ticker: str, *args, **kwargs):
+        try:
+            result = func(ticker, *args, **kwargs)
+        except Exception:
+            _drop_ticker(ticker.upper())
+            raise
+        if is_empty(result):
+            _drop_ticker(ticker.upper())
+        return result
+    return wrapper
+
 def retry_on_rate_limit(max_retries: int = 3, base_delay: float = 5.0, success_delay: float = 1.5):
     """Decorator to retry function calls on rate limit errors with exponential backoff.
 
@@ -30,7 +106,8 @@ def retry_on_rate_limit(max_retries: int = 3, base_delay: float = 5.0, success_d
                     if success_delay > 0:
                         time.sleep(success_delay)
                     return result
-                except (YFRateLimitError, Exception) as e:
+                except Exception as e:
+                    from yfinance.exceptions import YFRateLimitError
                     if isinstance(e, YFRateLimitError) or "rate limit" in str(e).lower() or "too many requests" in str(e).lower():
                         if attempt < max_retries - 1:
                             # Use longer delays based on 2025 yfinance community recommendations
@@ -48,33 +125,46 @@ def retry_on_rate_limit(max_retries: int = 3, base_delay: float = 5.0, success_d
         return wrapper
     return decorator
 
+@ttl_cache(ttl=INFO_CACHE_TTL)
 @retry_on_rate_limit(max_retries=3, base_delay=5.0, success_delay=1.5)
+@_drop_ticker_on_failure
 def get_ticker_info(ticker: str) -> dict | None:
-    return yf.Ticker(ticker).get_info()
+    # yfinance flags info as fetched before requesting it, so an overlapping call on the
+    # same Ticker would see None mid-fetch
+    t, lock = _get_ticker_entry(ticker)
+    with lock:
+        return t.get_info()
 
+@ttl_cache(ttl=FUNDAMENTALS_CACHE_TTL)
 @retry_on_rate_limit(max_retries=3, base_delay=5.0, success_delay=1.5)
+@_drop_ticker_on_failure
 def get_calendar(ticker: str) -> dict | None:
     """Get calendar events including earnings and dividend dates."""
-    return yf.Ticker(ticker).get_calendar()
+    return _get_ticker(ticker).get_calendar()
 
+@ttl_cache(ttl=ANALYST_CACHE_TTL)
 @retry_on_rate_limit(max_retries=3, base_delay=5.0, success_delay=1.5)
+@_drop_ticker_on_failure
 def get_analyst_data(ticker: str, data_type: Literal["recommendations", "upgrades"], limit: int = 5) -> pd.DataFrame | None:
     """Get analyst recommendations or upgrades/downgrades data."""
-    t = yf.Ticker(ticker)
+    t = _get_ticker(ticker)
     if data_type == "recommendations":
         df = t.get_recommendations()
     else:  # upgrades
         df = t.get_upgrades_downgrades()
-        if df is not None:
+        # Yahoo already returns history newest-first; only pay for a full sort when it doesn't
+        if df is not None and not df.index.is_monotonic_decreasing:
             df = df.sort_index(ascending=False)
-    
+
     return df.head(limit) if df is not None else None
 
+@ttl_cache(ttl=INFO_CACHE_TTL)
+@_drop_ticker_on_failure
 def get_news(ticker: str, limit: int = 10) -> list[dict] | None:
     """Return recent news in `[date,title,source,url]` dicts."""
 
     try:
-        items = yf.Ticker(ticker).get_news()[:limit]
+        items = _get_ticker(ticker).get_news()[:limit]
         if not items:
             return None
 
@@ -98,47 +188,79 @@ def get_news(ticker: str, limit: int = 10) -> list[dict] | None:
     except Exception:
         return None
 
+@ttl_cache(ttl=PRICE_CACHE_TTL)
 @retry_on_rate_limit(max_retries=3, base_delay=5.0, success_delay=1.5)
 def get_price_history(
     ticker: str,
     period: Literal["1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "ytd", "max"] = "1mo",
     interval: Literal["1m", "2m", "5m", "15m", "30m", "60m", "90m", "1h", "1d", "5d", "1wk", "1mo", "3mo"] = "1d"
 ) -> pd.DataFrame | None:
-    return yf.Ticker(ticker).history(period=period, interval=interval)
+    return _get_ticker(ticker).history(period=period, interval=interval)
+
+@ttl_cache(ttl=PRICE_CACHE_TTL)
+@retry_on_rate_limit(max_retries=3, base_delay=5.0, success_delay=1.5)
+def get_price_history_batch(
+    tickers: list[str],
+    period: Literal["1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "ytd", "max"] = "1mo",
+    interval: Literal["1m", "2m", "5m", "15m", "30m", "60m", "90m", "1h", "1d", "5d", "1wk", "1mo", "3mo"] = "1d"
+) -> dict[str, pd.DataFrame]:
+    """Download price history for several tickers in one threaded yf.download call."""
+    import yfinance as yf
+
+    tickers = [t.upper() for t in tickers]  # yf.download keys its columns by upper-cased symbol
+    # yf.download collects results in module-global state that every call resets
+    with _download_lock:
+        df = yf.download(
+            tickers, period=period, interval=interval, group_by="ticker",
+            actions=True, threads=True, progress=False
+        )
+    if df is None or df.empty:
+        return {}
+    return {
+        ticker: history
+        for ticker in tickers
+        if ticker in df.columns.get_level_values(0)
+        and not (history := df[ticker].dropna(how="all")).empty
+    }
 
+@ttl_cache(ttl=FUNDAMENTALS_CACHE_TTL)
 @retry_on_rate_limit(max_retries=3, base_delay=5.0, success_delay=1.5)
+@_drop_ticker_on_failure
 def get_financial_statements(
     ticker: str,
     statement_type: Literal["income", "balance", "cash"] = "income",
     frequency: Literal["quarterly", "annual"] = "quarterly"
 ) -> pd.DataFrame | None:
-    t = yf.Ticker(ticker)
-    statements = {
-        "income": {"annual": t.income_stmt, "quarterly": t.quarterly_income_stmt},
-        "balance": {"annual": t.balance_sheet, "quarterly": t.quarterly_balance_sheet},
-        "cash": {"annual": t.cashflow, "quarterly": t.quarterly_cashflow}
-    }
-    return statements[statement_type][frequency]
+    t = _get_ticker(ticker)
+    # Look up the getter first: the statement properties each trigger a fetch when accessed
+    statements = {"income": t.get_income_stmt, "balance": t.get_balance_sheet, "cash": t.get_cash_flow}
+    return statements[statement_type](pretty=True, freq="yearly" if frequency == "annual" else "quarterly")
 
+@ttl_cache(ttl=FUNDAMENTALS_CACHE_TTL)
 @retry_on_rate_limit(max_retries=3, base_delay=5.0, success_delay=1.5)
+@_drop_ticker_on_failure
 def get_institutional_holders(ticker: str, top_n: int = 20) -> tuple[pd.DataFrame | None, pd.DataFrame | None]:
-    t = yf.Ticker(ticker)
+    t = _get_ticker(ticker)
     inst = t.get_institutional_holders()
     fund = t.get_mutualfund_holders()
     return (inst.head(top_n) if inst is not None else None,
             fund.head(top_n) if fund is not None else None)
 
+@ttl_cache(ttl=FUNDAMENTALS_CACHE_TTL)
 @retry_on_rate_limit(max_retries=3, base_delay=5.0, success_delay=1.5)
+@_drop_ticker_on_failure
 def get_earnings_history(ticker: str, limit: int = 12) -> pd.DataFrame | None:
     """Get raw earnings history data.
     Default limit of 12 shows 3 years of quarterly earnings.
     """
-    df = yf.Ticker(ticker).get_earnings_history()
+    df = _get_ticker(ticker).get_earnings_history()
     return df.head(limit) if df is not None else None
 
+@ttl_cache(ttl=ANALYST_CACHE_TTL)
 @retry_on_rate_limit(max_retries=3, base_delay=5.0, success_delay=1.5)
+@_drop_ticker_on_failure
 def get_insider_trades(ticker: str, limit: int = 30) -> pd.DataFrame | None:
-    df = yf.Ticker(ticker).get_insider_transactions()
+    df = _get_ticker(ticker).get_insider_transactions()
     return df.head(limit) if df is not None else None
 
 @retry_on_rate_limit(max_retries=3, base_delay=5.0, success_delay=1.5)
@@ -158,17 +280,70 @@ def get_options_chain(
         if not expiry:
             return None, "No expiry date provided"
 
-        chain = yf.Ticker(ticker).option_chain(expiry)
+        chain = _get_ticker(ticker).option_chain(expiry)
 
+        # Tag the type from the calls/puts split rather than parsing contract symbols
+        calls = chain.calls.assign(optionType="C")
+        puts = chain.puts.assign(optionType="P")
         if option_type == "C":
-            return chain.calls, None
+            return calls, None
         elif option_type == "P":
-            return chain.puts, None
-        return pd.concat([chain.calls, chain.puts]), None
+            return puts, None
+        return pd.concat([calls, puts]), None
 
     except Exception as e:
         return None, str(e)
 
+def _top_options(
+    df: pd.DataFrame,
+    strike_lower: float | None = None,
+    strike_upper: float | None = None,
+    limit: int | None = None
+) -> pd.DataFrame:
+    """Apply strike bounds, then order by open interest and volume, keeping the top `limit` rows."""
+    if strike_lower is not None or strike_upper is not None:
+        # One pass over the raw strike array instead of chained Series comparisons
+        strikes = df['strike'].to_numpy()
+        lower = strike_lower if strike_lower is not None else -float('inf')
+        upper = strike_upper if strike_upper is not None else float('inf')
+        df = df[(strikes >= lower) & (strikes <= upper)]
+    df = df.sort_values(['openInterest', 'volume'], ascending=[False, False])
+    return df.head(limit) if limit else df
+
+def _iter_top_chains(
+    ticker: str,
+    expirations: list[str],
+    option_type: Literal["C", "P"] | None,
+    strike_lower: float | None,
+    strike_upper: float | None,
+    limit: int | None
+) -> Iterator[pd.DataFrame]:
+    """Fetch expiries on a bounded pool and yield each chain's top options, tagged with its expiryDate.
+
+    A slow or failing expiry is logged and skipped, not fatal. Futures are released as they
+    are consumed so each full chain can be freed as soon as its top rows are taken.
+    """
+    executor = ThreadPoolExecutor(max_workers=min(OPTION_CHAIN_WORKERS, len(expirations)))
+    try:
+        pending = deque((exp, executor.submit(get_options_chain, ticker, exp, option_type)) for exp in expirations)
+        while pending:
+            expiry, future = pending.popleft()
+            try:
+                chain, error = future.result(timeout=OPTION_CHAIN_TIMEOUT)
+            except TimeoutError:
+                chain, error = None, f"timed out after {OPTION_CHAIN_TIMEOUT}s"
+            del future
+            if error:
+                logger.warning(f"Skipping {ticker} options expiring {expiry}: {error}")
+                continue
+            if chain is not None:
+                top = _top_options(chain, strike_lower, strike_upper, limit)
+                del chain
+                if not top.empty:
+                    yield top.assign(expiryDate=expiry)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
 @retry_on_rate_limit(max_retries=3, base_delay=5.0, success_delay=1.5)
 def get_filtered_options(
     ticker: str,
@@ -177,72 +352,44 @@ def get_filtered_options(
     strike_lower: float | None = None,
     strike_upper: float | None = None,
     option_type: Literal["C", "P"] | None = None,
+    limit: int | None = None,
 ) -> tuple[pd.DataFrame | None, str | None]:
-    """Get filtered options data efficiently."""
+    """Get filtered options data efficiently, optionally only the `limit` contracts with the highest open interest."""
     try:
-        # Validate date formats before processing
-        if start_date:
-            try:
-                datetime.strptime(start_date, "%Y-%m-%d")
-            except ValueError:
-                return None, f"Invalid start_date format. Use YYYY-MM-DD"
-
-        if end_date:
-            try:
-                datetime.strptime(end_date, "%Y-%m-%d")
-            except ValueError:
-                return None, f"Invalid end_date format. Use YYYY-MM-DD"
-
-        t = yf.Ticker(ticker)
+        # Validate and parse date bounds once, before processing
+        try:
+            start_date_obj = date.fromisoformat(start_date) if start_date else None
+        except ValueError:
+            return None, "Invalid start_date format. Use YYYY-MM-DD"
+
+        try:
+            end_date_obj = date.fromisoformat(end_date) if end_date else None
+        except ValueError:
+            return None, "Invalid end_date format. Use YYYY-MM-DD"
+
+        t = _get_ticker(ticker)
         expirations = t.options
 
         if not expirations:
             return None, f"No options available for {ticker}"
 
-        # Convert date strings to datetime objects once
-        start_date_obj = datetime.strptime(start_date, "%Y-%m-%d").date() if start_date else None
-        end_date_obj = datetime.strptime(end_date, "%Y-%m-%d").date() if end_date else None
-
-        # Filter expiration dates before making API calls
-        valid_expirations = []
-        for exp in expirations:
-            exp_date = datetime.strptime(exp, "%Y-%m-%d").date()
-            if ((not start_date_obj or exp_date >= start_date_obj) and
-                (not end_date_obj or exp_date <= end_date_obj)):
-                valid_expirations.append(exp)
+        # Filter expiration dates before making API calls (fromisoformat is C-implemented, unlike strptime)
+        valid_expirations = [
+            exp for exp, exp_date in ((exp, date.fromisoformat(exp)) for exp in expirations)
+            if (not start_date_obj or exp_date >= start_date_obj)
+            and (not end_date_obj or exp_date <= end_date_obj)
+        ]
 
         if not valid_expirations:
             return None, f"No options found for {ticker} within specified date range"
 
-        # Parallel fetch options using ThreadPoolExecutor
-        filtered_option_chains = []
-        with ThreadPoolExecutor() as executor:
-            options_results = list(executor.map(
-                lambda exp: get_options_chain(ticker, exp, option_type),
-                valid_expirations
-            ))
-
-        for (chain, error), expiry in zip(options_results, valid_expirations):
-            if error:
-                continue
-            if chain is not None:
-                filtered_option_chains.append(chain.assign(expiryDate=expiry))
-
-        if not filtered_option_chains:
+        top_chains = list(_iter_top_chains(ticker, valid_expirations, option_type, strike_lower, strike_upper, limit))
+        if not top_chains:
             return None, f"No options found for {ticker} matching criteria"
 
-        df = pd.concat(filtered_option_chains, ignore_index=True)
-
-        # Apply strike price filters
-        if strike_lower is not None or strike_upper is not None:
-            mask = pd.Series(True, index=df.index)
-            if strike_lower is not None:
-                mask &= df['strike'] >= strike_lower
-            if strike_upper is not None:
-                mask &= df['strike'] <= strike_upper
-            df = df[mask]
-
-        return df.sort_values(['openInterest', 'volume'], ascending=[False, False]), None
+        # Each chain is already filtered and cut to its own top `limit`, so this merge stays small
+        df = pd.concat(top_chains, ignore_index=True)
+        return _top_options(df, limit=limit), None
 
     except Exception as e:
         return None, f"Failed to retrieve options data: {str(e)}"
\ No newline at end of file